@@ -7,6 +7,7 @@ the existing libifisam/libifisamx libraries are combined such that the SONAME
 can be verified.
 '''
 
+import functools
 import os
 from ctypes import c_char_p, c_int, c_int32, CDLL, _dlopen
 from .common import ISAMcommonMixin, ISAMindexMixin, ISAMkeydesc, ISAMdictinfo, create_record
@@ -16,6 +17,19 @@ from ...utils import ISAM_str
 _lib_nm = 'libpyifisam'
 _lib_so = os.path.join(os.path.dirname(__file__), _lib_nm + '.so')
 
+# Open the underlying library once when it is first required
+@functools.lru_cache(maxsize=None)
+def _load_lib():
+  return CDLL(_lib_nm, handle=_dlopen(_lib_so))
+
+class _LazyLibrary:
+  '''Descriptor deferring the loading of the underlying library until first used,
+     it then replaces itself with the library so later lookups are direct'''
+  def __get__(self, inst, owner):
+    lib = _load_lib()
+    ISAMobjectMixin._lib = lib
+    return lib
+
 class ISAMobjectMixin(ISAMcommonMixin):
   '''This provides the interface to the underlying ISAM libraries.
      The underlying ISAM routines are loaded on demand with a
@@ -23,11 +37,11 @@ class ISAMobjectMixin(ISAMcommonMixin):
   '''
   __slots__ = ()
 
-  # Open the underlying library once
-  _lib = CDLL(_lib_nm, handle=_dlopen(_lib_so))
+  # Open the underlying library on first use
+  _lib = _LazyLibrary()
 
-  # The _const dictionary initially consists of the ctypes type
-  # which will be mapped to the correct variable when accessed.
+  # The _const dictionary consists of the ctypes type of each variable
+  # which is mapped to a property at the end of this module.
   _const = {
     'iserrno'      : c_int,    'iserrio'      : c_int,
     'isrecnum'     : c_int32,  'isreclen'     : c_int,
@@ -35,13 +49,23 @@ class ISAMobjectMixin(ISAMcommonMixin):
     'isserial'     : c_char_p, 'issingleuser' : c_int,
     'is_nerr'      : c_int,    'is_errlist'   : None
   }
+
+  # The _attr_cache dictionary holds the library entry points once they have
+  # been resolved, the variables in _const are not cached as they change.
+  _attr_cache = {}
   
   def __getattr__(self,name):
     '''Lookup the ISAM function and return the entry point into the library
        or define and return the numeric equivalent'''
     if not isinstance(name, str):
       raise AttributeError(name)
-    return super().__getattr__(name)
+    cache = type(self)._attr_cache
+    val = cache.get(name)
+    if val is None:
+      val = super().__getattr__(name)
+      if name.startswith('_is'):
+        cache[name] = val
+    return val
 
   def strerror(self, errcode=None):
     if errcode is None:
@@ -51,3 +75,31 @@ class ISAMobjectMixin(ISAMcommonMixin):
       return ISAM_str(self.is_errlist[errnum])
     else:
       return os.strerror(errcode)
+
+def _const_property(name, ctype):
+  '''Return a property providing access to the library variable NAME, the
+     variable is located on first access and read or written directly after.'''
+  @functools.lru_cache(maxsize=None)
+  def _variable(size):
+    if ctype is None:
+      return (c_char_p * size).in_dll(_load_lib(), name)
+    return ctype.in_dll(_load_lib(), name)
+
+  if ctype is None:
+    # Arrays are returned as is to be indexed by the caller
+    def fget(self):
+      return _variable(self._vld_errno[1] - self._vld_errno[0])
+    return property(fget)
+
+  def fget(self):
+    val = _variable(0).value
+    return val if isinstance(val, int) else ISAM_str(val)
+
+  def fset(self, value):
+    _variable(0).value = value
+  return property(fget, fset)
+
+# Map the library variables to properties once rather than on each lookup
+for _name, _ctype in ISAMobjectMixin._const.items():
+  setattr(ISAMobjectMixin, _name, _const_property(_name, _ctype))
+del _name, _ctype
@@ -2,12 +2,28 @@
 Common functions used by various tests
 '''
 
+import functools
+import operator
+from .constants import ColumnType
+from .utils import ISAM_bytes
+
 def dump_record_exp_eq(tabobj, idxkey, mode, colname, colval):
   'Dump records using explicit read MODE and check COLNAME=COLVAL'
-  record = tabobj.read(idxkey, mode, colval)
-  while getattr(record, colname) == colval:
+  # Resolve the column descriptor once rather than by name on each record,
+  # text columns are compared against the undecoded bytes in the record
+  rectype = type(tabobj._default_record())
+  column = rectype.__dict__.get(colname)
+  if column is None:
+    fget = operator.attrgetter(colname)
+  elif isinstance(colval, str) and column._type == ColumnType.CHAR:
+    colval = ISAM_bytes(colval)
+    fget = column._raw_value
+  else:
+    fget = functools.partial(column.__get__, objtype=rectype)
+  for record in tabobj.readv(idxkey, mode, colval):
+    if fget(record) != colval:
+      break
     print(record)
-    record = tabobj.read()
 
 def dump_record_imp(tabobj, *, record=None, idxkey=None, mode=None, **colcheck):
   '''Dump records using implicit mode and check from COLCHECK and auto-selecting
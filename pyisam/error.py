@@ -5,27 +5,35 @@ created between the vaious sub-modules.
 
 class IsamException(Exception):
   'General exception raised by ISAM'
+  __slots__ = ()
 
 class IsamError(IsamException):
   'General error from package'
+  __slots__ = ()
 
 class IsamIterError(IsamException):
   'Iterator based error'
+  __slots__ = ()
   
 class IsamNotOpen(IsamException):
   'Exception raised when ISAM table not open'
+  __slots__ = ()
 
 class IsamOpen(IsamException):
   'Exception when ISAM table already opened'
+  __slots__ = ()
 
 class IsamReadOnly(IsamNotOpen):
   'Exception raised when ISAM table not opened with writable mode'
+  __slots__ = ()
 
 class IsamRecordMutable(IsamException):
   'Exception raised when given a not mutable buffer'
+  __slots__ = ()
 
 class IsamFunctionFailed(IsamException):
   'Exception raised when an ISAM function is not found in the libaray'
+  __slots__ = ('tabname', 'errno', 'errstr')
   def __init__(self, tabname, errno, errstr=None):
     self.tabname = tabname
     self.errno = errno
@@ -38,15 +46,19 @@ class IsamFunctionFailed(IsamException):
 
 class IsamVariableLength(IsamException):
   'Exception raised when opening a variable length file if not enabled'
+  __slots__ = ()
 
 class IsamNoRecord(IsamException):
   'Exception raised when no record was found'
+  __slots__ = ()
 
 class IsamEndFile(IsamException):
   'End of file reached'
+  __slots__ = ()
 
 class IsamNoPrimaryIndex(IsamException):
   'Exception raised when no primary index has been defined on table'
+  __slots__ = ('tabname',)
   def __init__(self, tabname):
     self.tabname = tabname._name_ if hasattr(tabname, '_name_') else tabname
 
@@ -55,6 +67,7 @@ class IsamNoPrimaryIndex(IsamException):
 
 class IsamNoIndex(IsamException):
   'Exception raised when an index is missing from a table instance'
+  __slots__ = ('tabname', 'idxname')
   def __init__(self, tabname, idxname):
     self.tabname = tabname._name_ if hasattr(tabname, '_name_') else tabname
     self.idxname = idxname._name_ if hasattr(idxname, '_name_') else idxname
@@ -64,3 +77,4 @@ class IsamNoIndex(IsamException):
 
 class TableDefnError(IsamException):
   'General exception raised during table definition'
+  __slots__ = ()
@@ -112,6 +112,10 @@ class _BaseColumn:
       value = self._nullval() if callable(self._nullval) else self._nullval
     self._struct.pack_into(inst._buffer, self._offset, value)
 
+  def _raw_value(self, inst):
+    'Return the value of the column as held in the record buffer'
+    return self._struct.unpack_from(inst._buffer, self._offset)[0]
+
   # Template for this column
   _template = ''
 
@@ -142,7 +146,13 @@ class CharColumn(_BaseColumn):
     return value.decode('utf-8').replace('\x00', ' ').rstrip()
 
   def _preprocess(self, value):
-    return value.encode('utf-8').replace(b'\x00', b' ') 
+    if isinstance(value, str):
+      value = value.encode('utf-8')
+    return value.replace(b'\x00', b' ') 
+
+  def _raw_value(self, inst):
+    'Return the value of the column as bytes without decoding it'
+    return super()._raw_value(inst).replace(b'\x00', b' ').rstrip()
   
 class TextColumn(_BaseColumn):
   __slots__ = ('_blankval', )
@@ -161,13 +171,18 @@ class TextColumn(_BaseColumn):
   def _preprocess(self, value):
     if value is None:
       return self._blankval
-    value = value.encode('utf-8')
+    if isinstance(value, str):
+      value = value.encode('utf-8')
     if self._size < len(value):
       value = value[:self._size]
     elif len(value) < self._size:
       value += self._blankval[-self._size:]
     return value
 
+  def _raw_value(self, inst):
+    'Return the value of the column as bytes without decoding it'
+    return super()._raw_value(inst).replace(b'\x00', b' ').rstrip()
+
   # Template for fields of this column type
   _template = '{0.length}'
   
@@ -10,12 +10,19 @@ from .record import create_record_class, ISAMrecordBase
 from ..backend import _backend
 from ..constants import LockMode, OpenMode, ReadMode
 from ..error import IsamIterError, IsamNotOpen, IsamError, IsamNoPrimaryIndex
+from ..error import IsamEndFile, IsamNoRecord
 from ..isam import ISAMobject
 from ..tabdefns import TableDefnIndex
 
 # Define the objects that are available using 'from .table import *'
 __all__ = ('ISAMtable',)
 
+# Bind the read modes used on every read once, along with the sets of modes
+# that position using a key and those that continue in the next direction.
+ISNEXT, ISPREV, ISLAST, ISCURR = ReadMode.ISNEXT, ReadMode.ISPREV, ReadMode.ISLAST, ReadMode.ISCURR
+_key_modes = frozenset((ReadMode.ISEQUAL, ReadMode.ISGREAT, ReadMode.ISGTEQ))
+_next_modes = _key_modes | {ReadMode.ISFIRST}
+
 class TableIndexMapElem:
   '''Class that provides an element in the table index mapping object.
      It is also used at application level to provide index information on a
@@ -418,13 +425,13 @@ class ISAMtable:
     # underlying isread function without excess processing. Updates the
     # current record and last mode.
     if len(args) < 1:
-      mode = getattr(self, '_lastread', ReadMode.ISNEXT)
-      if mode in (ReadMode.ISFIRST, ReadMode.ISEQUAL, ReadMode.ISGREAT, ReadMode.ISGTEQ):
-        mode = ReadMode.ISNEXT
-      elif mode == ReadMode.ISLAST:
-        mode = ReadMode.ISPREV
+      mode = getattr(self, '_lastread', ISNEXT)
+      if mode in _next_modes:
+        mode = ISNEXT
+      elif mode == ISLAST:
+        mode = ISPREV
       elif mode is None:
-        mode = ReadMode.ISNEXT
+        mode = ISNEXT
       recbuff = self._default_record()
       self._isobj.isread(recbuff._buffer, mode)
       self._recnum = self._isobj.isrecnum
@@ -487,16 +494,16 @@ class ISAMtable:
 
     # Determine the mode of access required
     if mode is None:
-      mode = getattr(self, '_lastread', ReadMode.ISNEXT)
-      if mode in (ReadMode.ISFIRST, ReadMode.ISEQUAL, ReadMode.ISGREAT, ReadMode.ISGTEQ):
-        mode = ReadMode.ISNEXT
-      elif mode == ReadMode.ISLAST:
-        mode = ReadMode.ISPREV
+      mode = getattr(self, '_lastread', ISNEXT)
+      if mode in _next_modes:
+        mode = ISNEXT
+      elif mode == ISLAST:
+        mode = ISPREV
       elif mode is None:
-        mode = ReadMode.ISNEXT
+        mode = ISNEXT
     
     # Fill the index information into the record buffer
-    if mode in (ReadMode.ISEQUAL, ReadMode.ISGREAT, ReadMode.ISGTEQ):
+    if mode in _key_modes:
       index.fill_fields(recbuff, *args, **kwd)
 
     if index == self._curindex:
@@ -506,7 +513,7 @@ class ISAMtable:
     else:
       # Issue a restart on the selected index using the specified mode
       self._isobj.isstart(index.as_keydesc(self._isobj, recbuff, optimize=True), mode, recbuff._buffer)
-      self._isobj.isread(recbuff._buffer, ReadMode.ISCURR)
+      self._isobj.isread(recbuff._buffer, ISCURR)
       
       # Make this the current index
       self._curindex = index
@@ -520,6 +527,68 @@ class ISAMtable:
     # Return the record which can then be used as required
     return recbuff
 
+  def readv(self, *args, batch=512, **kwd):
+    '''Generator returning the records found using the same calling sequence as read(),
+       the subsequent records are read ahead from the underlying ISAM table in batches
+       doubling in size up to BATCH and copied back into the record buffer as each one
+       is returned. If closed early the table is positioned back on the last record.'''
+    if batch < 1:
+      raise ValueError('Must provide a positive batch size')
+    recbuff = self.read(*args, **kwd)
+    yield recbuff
+
+    # Determine the direction of access to continue reading the records in
+    mode = self._lastread
+    if mode in _next_modes or mode is None:
+      mode = ISNEXT
+    elif mode == ISLAST:
+      mode = ISPREV
+
+    # Bind the low-level objects once so that the inner loop avoids the lookups
+    buffer = recbuff._buffer
+    isobj = self._isobj
+    isread = isobj.isread
+    rows = []
+    size = 1
+    more = True
+    ahead = False       # Set while the table is positioned beyond the record returned
+    try:
+      while more:
+        try:
+          for _ in range(size):
+            isread(buffer, mode)
+            rows.append((bytes(buffer), isobj.isrecnum))
+        except (IsamEndFile, IsamNoRecord):
+          more = False
+        self._lastread = mode
+        last = len(rows) - 1
+        for num, (raw, self._recnum) in enumerate(rows):
+          buffer[:] = raw
+          ahead = num < last or not more
+          yield recbuff
+        ahead = False
+        rows.clear()
+        size = min(size << 1, batch)
+    finally:
+      if ahead:
+        self._reposition(raw, self._recnum)
+
+  def _reposition(self, raw, recnum):
+    'Internal method to position the table back on record RECNUM whose contents are RAW'
+    recbuff = self._default_record()
+    recbuff._buffer[:] = raw
+    if self._curindex is None:
+      self._isobj.isrecnum = recnum
+      kdesc = RecordOrderIndex().as_keydesc(self._isobj, recbuff)
+    else:
+      kdesc = self._curindex.as_keydesc(self._isobj, recbuff, optimize=True)
+    self._isobj.isstart(kdesc, ReadMode.ISEQUAL, recbuff._buffer)
+    self._isobj.isread(recbuff._buffer, ISCURR)
+
+    # Step over any duplicates of the key preceding the record itself
+    while self._isobj.isrecnum != recnum:
+      self._isobj.isread(recbuff._buffer, ISNEXT)
+
   def insert(self, recbuff=None, setcurr=False, *args, **kwd):
     'Insert a record'
     if recbuff is None:
@@ -122,22 +122,6 @@ parser.add_argument('-e', '--error', '-Werror',
                     default=True)
 opts = parser.parse_args()
 
-def run_test(testdir, testnum, opts, avail_tests=avail_tests):
-  'Run a particular test within a particular test directory'
-  mod = importlib.import_module(f'.{avail_tests[testnum].name[:-3]}', testdir)
-  if opts.dry_run and hasattr(mod, 'attr') and 'write' in mod.attr:
-    if opts.debug:
-      print(f'Test {testnum} skipped, no updates allowed')
-    return None
-  try:
-    if opts.debug:
-      print(f'Test {testnum}:')
-    return getattr(mod, 'test')(opts)
-  except AttributeError:
-    return None
-  except:
-    raise
-  
 def give_version():
   from pyisam import __version__
   from pyisam.backend import use_conf, use_isam
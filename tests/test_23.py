@@ -0,0 +1,41 @@
+'''
+Test 23: Compare the records returned by readv() with those from repeated read() calls
+'''
+from pyisam.constants import OpenMode, ReadMode
+from pyisam.error import IsamEndFile
+from pyisam.table import ISAMtable
+from pyisam.tabdefns.stxtables import DEFILEdefn
+
+def read_all(tabobj, *args):
+  'Return the raw records and record numbers from ARGS until the end of the table'
+  rows = []
+  try:
+    record = tabobj.read(*args)
+    while True:
+      rows.append((bytes(record._buffer), tabobj._recnum))
+      record = tabobj.read()
+  except IsamEndFile:
+    return rows
+
+def test(opts):
+  DEFILE = ISAMtable(DEFILEdefn, tabpath='data', mode=OpenMode.ISINPUT)
+  expected = read_all(DEFILE, 'key', ReadMode.ISGREAT, 'defile')
+
+  # Stop part way through a batch and check the next read() continues from there
+  for stop in (1, 2, 3, 10):
+    rows = []
+    for record in DEFILE.readv('key', ReadMode.ISGREAT, 'defile'):
+      rows.append((bytes(record._buffer), DEFILE._recnum))
+      if len(rows) == stop:
+        break
+    record = DEFILE.read()
+    rows.append((bytes(record._buffer), DEFILE._recnum))
+    if rows != expected[:stop + 1]:
+      raise ValueError(f'readv() stopped after {stop} records differs from read()')
+
+  # Read through to the end of the table
+  rows = [(bytes(record._buffer), DEFILE._recnum)
+          for record in DEFILE.readv('key', ReadMode.ISGREAT, 'defile')]
+  if rows != expected:
+    raise ValueError('readv() to the end of the table differs from read()')
+  print('READV:', len(rows), 'records')
@@ -3,14 +3,21 @@ Build the CFFI and CTYPES backend using the appropriate library for the specifie
 platform and bit-size (either 32- or 64-bit). By default build for the current
 platform and bit-size of architecture the script is being run on.
 '''
+import atexit
+import concurrent.futures
+import contextlib
 import hashlib
+import json
+import os
 import pathlib
 import shutil
+import sys
 import sysconfig
 import subprocess
 
-# Define the working directory
-WORKDIR=pathlib.Path('/tmp/pyisam')
+# Define the working directory, this holds the build caches between runs and
+# can be kept elsewhere by setting PYISAM_CACHE_DIR
+WORKDIR=pathlib.Path(os.environ.get('PYISAM_CACHE_DIR', '/tmp/pyisam'))
 INSTDIR=pathlib.Path('pyisam/backend')
 SOURCEDIR=pathlib.Path('.')
 
@@ -28,77 +35,294 @@ class BuildNoLibraryFound(FileNotFoundError):
 # Determine the extension used for libraries
 _soext = sysconfig.get_config_var('SHLIB_SUFFIX')
 
+# Size of the buffer used when reading files to be hashed
+_hash_bufsz = 1 << 20
+
+# The hash is only used to detect changed files so BLAKE2b is used by default,
+# set PYISAM_HASH to use another algorithm (eg 'sha256' where FIPS is required)
+_hash_name = os.environ.get('PYISAM_HASH', 'blake2b')
+
+def _new_hash():
+  'Return a new hash object of the selected algorithm'
+  if _hash_name == 'blake2b':
+    return hashlib.blake2b(digest_size=32)
+  return hashlib.new(_hash_name)
+
+def _hash_file(path):
+  'Return the digest of the contents of PATH reading it through a single buffer'
+  hsh = _new_hash()
+  buff = memoryview(bytearray(_hash_bufsz))
+  with open(path, 'rb', buffering=0) as fd:
+    while nbytes := fd.readinto(buff):
+      hsh.update(buff[:nbytes])
+  return hsh.digest()
+
+def _hash_and_copy(srcfile, dstfile):
+  '''Copy SRCFILE to a temporary file beside DSTFILE hashing the data as it is
+     read, returns the digest and the name of the temporary file'''
+  import tempfile
+  hsh = _new_hash()
+  buff = memoryview(bytearray(_hash_bufsz))
+  dstdir, dstname = os.path.split(dstfile)
+  fd, tmpfile = tempfile.mkstemp(prefix=f'.{dstname}.', dir=dstdir or '.')
+  try:
+    with open(srcfile, 'rb', buffering=0) as src, open(fd, 'wb') as dst:
+      os.fchmod(dst.fileno(), os.fstat(src.fileno()).st_mode & 0o7777)
+      while nbytes := src.readinto(buff):
+        hsh.update(buff[:nbytes])
+        dst.write(buff[:nbytes])
+  except BaseException:
+    os.unlink(tmpfile)
+    raise
+  return hsh.digest(), tmpfile
+
+def _elf_settings(path):
+  '''Return the SONAME and RPATH (or RUNPATH) of the library PATH using pyelftools,
+     or None if pyelftools is not available'''
+  try:
+    from elftools.elf.elffile import ELFFile
+  except ImportError:
+    return None
+  settings = {'soname': b'', 'rpath': b''}
+  with open(path, 'rb') as fd:
+    dynamic = ELFFile(fd).get_section_by_name('.dynamic')
+    for tag in dynamic.iter_tags() if dynamic else ():
+      if tag.entry.d_tag == 'DT_SONAME':
+        settings['soname'] = tag.soname.encode()
+      elif tag.entry.d_tag == 'DT_RUNPATH':
+        settings['rpath'] = tag.runpath.encode()
+      elif tag.entry.d_tag == 'DT_RPATH' and not settings['rpath']:
+        settings['rpath'] = tag.rpath.encode()
+  return settings
+
+# Linux ioctl used to share the data of a file on a copy-on-write filesystem
+_FICLONE = 0x40049409
+
+def _fast_copy(srcfile, dstfile, link=False):
+  '''Copy SRCFILE to DSTFILE as a hardlink if LINK is set, otherwise as a reflink
+     where the filesystem supports it, falling back to copying the data. A hardlink
+     shares the file itself so is only used for files never modified in place.'''
+  if os.path.lexists(dstfile):
+    os.unlink(dstfile)
+  if link:
+    try:
+      os.link(srcfile, dstfile)
+      return
+    except OSError:
+      pass
+  try:
+    import fcntl
+    with open(srcfile, 'rb') as src, open(dstfile, 'wb') as dst:
+      fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+    return
+  except (ImportError, OSError):
+    pass
+  shutil.copyfile(srcfile, dstfile)
+
+@contextlib.contextmanager
+def _ccache_env(basedir):
+  '''Compile through ccache with the compiler configured for Python, if ccache is
+     available and CC has not been set, restoring the environment afterwards'''
+  cc = sysconfig.get_config_var('CC')
+  if 'CC' in os.environ or not cc or not shutil.which('ccache'):
+    yield
+    return
+  settings = {
+    'CC'             : f'ccache {cc}',
+    'LDSHARED'       : sysconfig.get_config_var('LDSHARED'),  # Link without ccache
+    'CCACHE_BASEDIR' : basedir,   # Make the paths seen by ccache relative
+  }
+  saved = {name: os.environ.get(name) for name in settings}
+  for name, value in settings.items():
+    if value and saved[name] is None:
+      os.environ[name] = value
+  try:
+    yield
+  finally:
+    for name, value in saved.items():
+      if value is None:
+        os.environ.pop(name, None)
+
+class _HashCache:
+  'Persistent cache of file digests which are reused while the size and mtime are unchanged'
+  def __init__(self, path):
+    self._path = pathlib.Path(path)
+    self._changed = False
+    try:
+      with self._path.open() as fd:
+        cache = json.load(fd)
+      if cache.get('hash') != _hash_name:
+        cache = {}
+    except (OSError, ValueError):
+      cache = {}
+    self._files = cache.get('files', {})
+    self._derived = cache.get('derived', {})
+
+  def digest(self, path, pstat=None):
+    'Return the digest of PATH, only hashing the file if not known for its size and mtime'
+    if pstat is None:
+      pstat = os.stat(path)
+    key = str(path)
+    entry = self._files.get(key)
+    if entry and entry[0] == pstat.st_size and entry[1] == pstat.st_mtime_ns:
+      return bytes.fromhex(entry[2])
+    digest = _hash_file(path)
+    self.update(path, pstat, digest)
+    return digest
+
+  def update(self, path, pstat, digest):
+    'Record the DIGEST of PATH calculated elsewhere'
+    self._files[str(path)] = [pstat.st_size, pstat.st_mtime_ns, digest.hex()]
+    self._changed = True
+
+  def derive(self, path, origin):
+    '''Record that PATH, as it is now, was produced by modifying a copy of a file
+       with the digest ORIGIN'''
+    pstat = os.stat(path)
+    self._derived[str(path)] = [origin.hex(), pstat.st_size, pstat.st_mtime_ns]
+    self._changed = True
+
+  def derived_from(self, path, pstat, srcfile, srcstat):
+    'Return whether PATH is unchanged since it was derived from the contents of SRCFILE'
+    entry = self._derived.get(str(path))
+    return bool(entry) and entry[1] == pstat.st_size and entry[2] == pstat.st_mtime_ns and \
+           entry[0] == self.digest(srcfile, srcstat).hex()
+
+  def save(self):
+    'Write the cache back if any digests were added'
+    if not self._changed:
+      return
+    try:
+      with self._path.open('w') as fd:
+        json.dump({'hash': _hash_name, 'files': self._files, 'derived': self._derived}, fd)
+      self._changed = False
+    except OSError:
+      pass
+
+# Share a single cache for each working directory saving them on exit
+_hash_caches = {}
+def _get_hash_cache(workdir):
+  cachepath = pathlib.Path(workdir) / '.hashcache.json'
+  try:
+    cache = _hash_caches[cachepath]
+  except KeyError:
+    cache = _hash_caches[cachepath] = _HashCache(cachepath)
+    atexit.register(cache.save)
+  return cache
+
 class Builder:
   'Base class providing shared CFFI and CTYPES support'
   def __init__(self, workdir, srcdir, instdir, bits, lngsz=None):
     self._workdir = pathlib.Path(workdir)
     self._srcdir = pathlib.Path(srcdir)
     self._instdir = pathlib.Path(instdir)
+    self._srcdir_str = str(self._srcdir)
+    self._workdir_str = str(self._workdir)
+    self._instdir_str = str(self._instdir)
+    self._hashes = _get_hash_cache(self._workdir)
     self.lngsz = lngsz
     self.bits = bits
 
+  def needs_compile(self):
+    'Return whether compile() has to do any work, which is assumed unless known'
+    return True
+
   def patchlibrary(self, libname, rpath=None):
     'Patch the given library settings its SONAME and RPATH appropriately'
-    def patch_option(option, value, path_libname):
-      pret = subprocess.run(['patchelf', f'--print-{option}', path_libname],
+    wrk_libname = self._workdir / libname.soext
+    options = {'soname': libname.soext.encode()}
+    if rpath:
+      options['rpath'] = rpath
+
+    # Retrieve the current settings in-process if pyelftools is available or
+    # otherwise with a single call (patchelf always prints the SONAME before the
+    # RPATH), and only update those that are different to avoid changing the
+    # library when it is already correct.
+    settings = _elf_settings(wrk_libname)
+    if settings is not None:
+      current = [settings[option] for option in options]
+    else:
+      pret = subprocess.run(['patchelf', *[f'--print-{option}' for option in options], wrk_libname],
                             stdout = subprocess.PIPE,
                             stderr = subprocess.DEVNULL)
-      if pret.returncode == 0 and pret.stdout.rstrip() != value:
-        pret = subprocess.run(['patchelf', f'--set-{option}', value, path_libname],
-                              stdout = subprocess.DEVNULL,
-                              stderr = subprocess.DEVNULL)
-      return pret.returncode == 0
-
-    bin_libname = libname.soext.encode()
-    wrk_libname = self._workdir / libname.soext
-    ok = patch_option('soname', bin_libname, wrk_libname)
-    if ok and rpath:
-      ok = patch_option('rpath', rpath, wrk_libname)
-    if not ok:
-      raise ValueError('Patchelf update failed')
-
-  def _copy_on_change(self, srcfile, dstfile):
-    'Internal helper method'
-    if not srcfile.exists():
+      current = pret.stdout.splitlines() if pret.returncode == 0 else []
+    cmd = ['patchelf']
+    for num, (option, value) in enumerate(options.items()):
+      if num >= len(current) or current[num].rstrip() != value:
+        cmd += [f'--set-{option}', value]
+    if len(cmd) > 1:
+      # The unpatched copy has the contents of the source library, record the
+      # patched copy against it so that prepare() keeps it while that is unchanged
+      origin = self._hashes.digest(wrk_libname)
+      pret = subprocess.run(cmd + [wrk_libname],
+                            stdout = subprocess.DEVNULL,
+                            stderr = subprocess.DEVNULL)
+      if pret.returncode:
+        raise ValueError('Patchelf update failed')
+      self._hashes.derive(wrk_libname, origin)
+
+  def _copy_on_change(self, srcfile, dstfile, link=False):
+    'Internal helper method, LINK permits DSTFILE to be a hardlink to SRCFILE'
+    try:
+      srcstat = os.stat(srcfile)
+    except FileNotFoundError:
       raise BuildException(f'No source file to copy: {srcfile}')
-    newhash = hashlib.sha256(srcfile.open('rb').read())
-    if dstfile.exists():
-      oldhash = hashlib.sha256(dstfile.open('rb').read())
-      changed = newhash.digest() != oldhash.digest()
-    else:
+    try:
+      dststat = os.stat(dstfile)
+    except FileNotFoundError:
+      dststat = None
+    if dststat is not None and self._hashes.derived_from(dstfile, dststat, srcfile, srcstat):
+      # Keep a copy that was modified after being copied from the same source
+      return
+    if dststat is None or srcstat.st_size != dststat.st_size:
       changed = True
+    elif srcstat.st_mtime_ns == dststat.st_mtime_ns:
+      # Files of the same size and modification time are taken as unchanged
+      return
+    elif link:
+      changed = self._hashes.digest(srcfile, srcstat) != self._hashes.digest(dstfile, dststat)
+    else:
+      # Hash the source while copying it so that it is only read once,
+      # the copy replaces the destination atomically if the contents differ
+      digest, tmpfile = _hash_and_copy(srcfile, dstfile)
+      self._hashes.update(srcfile, srcstat, digest)
+      if digest == self._hashes.digest(dstfile, dststat):
+        os.unlink(tmpfile)
+      else:
+        os.replace(tmpfile, dstfile)
+      changed = False
     if changed:
-      shutil.copyfile(srcfile, dstfile)
+      _fast_copy(srcfile, dstfile, link)
       shutil.copymode(srcfile, dstfile)
+    # Keep the timestamps in step so the next check is decided by the sizes and times
+    os.utime(dstfile, ns=(srcstat.st_atime_ns, srcstat.st_mtime_ns))
 
-  def source_on_change(self, srcdir, *filename):
+  def source_on_change(self, srcdir, *filename, link=False):
     # Copy a new version of the given FILENAMEs into the working
-    # directory if they have changed or are not present.
-    if srcdir is None:
-      srcdir = self._srcdir
+    # directory if they have changed or are not present, LINK is
+    # set when the files are never modified in the working directory.
+    srcdir = self._srcdir_str if srcdir is None else os.fspath(srcdir)
     if isinstance(filename[0], list):
       filename = filename[0]
     for name in filename:
-      iname = pathlib.Path(name.soext if isinstance(name, _Library) else name)
-      if iname.is_absolute() or len(iname.parts) > 1:
-        src_file = iname
-        dst_file = self._workdir / iname.parts[-1]
-      else:
-        src_file = srcdir / iname
-        dst_file = self._workdir / iname
-      self._copy_on_change(src_file, dst_file)
+      iname = name.soext if isinstance(name, _Library) else os.fspath(name)
+      bname = os.path.basename(iname)
+      src_file = iname if bname != iname else os.path.join(srcdir, iname)
+      self._copy_on_change(src_file, os.path.join(self._workdir_str, bname), link)
 
   def install_on_change(self, libname, subdir=None):
     'Copy a new version of the given library if it has changed or not present'
     if isinstance(libname, _Library):
       sname = libname.soext
     else:
-      sname = libname.parts[-1] if libname.is_absolute() else libname
+      sname = os.fspath(libname)
+      if os.path.isabs(sname):
+        sname = os.path.basename(sname)
     if subdir is None:
-      iname = self._instdir / sname
+      iname = os.path.join(self._instdir_str, sname)
     else:
-      iname = self._instdir / subdir / sname
-    self._copy_on_change(self._workdir / sname, iname)
+      iname = os.path.join(self._instdir_str, subdir, sname)
+    self._copy_on_change(os.path.join(self._workdir_str, sname), iname)
 
 class CTYPES_Builder(Builder):
   'Class providing the shared methods for the CTYPES builders'
@@ -135,17 +359,105 @@ class CTYPES_Builder(Builder):
     if pret.returncode:
       raise BuildException('Linker failed')
 
+# Define the items found in decimal.h that are shared by the variants,
+# CHAR is the character type and DECLONG the long type used by the variant.
+_decimal_cdef = '''
+struct decimal;
+extern int   decadd(struct decimal *, struct decimal *, struct decimal *);
+extern int   decsub(struct decimal *, struct decimal *, struct decimal *);
+extern int   decmul(struct decimal *, struct decimal *, struct decimal *);
+extern int   decdiv(struct decimal *, struct decimal *, struct decimal *);
+extern int   deccmp(struct decimal *, struct decimal *);
+extern void  deccopy(struct decimal *, struct decimal *);
+extern int   deccvasc({char} *, int, struct decimal *);
+extern int   deccvdbl(double, struct decimal *);
+extern int   deccvint(int, struct decimal *);
+extern int   deccvlong({declong}, struct decimal *);
+extern {char} *dececvt(struct decimal *, int, int *, int *);
+extern {char} *decfcvt(struct decimal *, int, int *, int *);
+extern int   dectoasc(struct decimal *, {char} *, int, int);
+extern int   dectodbl(struct decimal *, double *);
+extern int   dectoint(struct decimal *, int *);
+extern int   dectolong(struct decimal *, {declong} *);
+extern int   deccvflt(double, struct decimal *);
+extern int   dectoflt(struct decimal *, float *);
+'''
+
+# Define the structures found in isam.h that are shared by the variants
+_isam_struct_cdef = '''
+struct keypart {{
+    short kp_start;
+    short kp_leng;
+    short kp_type;
+}};
+struct keydesc {{
+    short          k_flags;
+    short          k_nparts;
+    struct keypart k_part[{max_key_parts}];
+    short          k_len;
+    ...;
+}};
+struct dictinfo {{
+    short        di_nkeys;
+    short        di_recsize;
+    short        di_idxsize;
+    {lngsz} di_nrecords;
+}};
+'''
+
+# Define the functions found in isam.h that are shared by the variants
+_isam_func_cdef = '''
+extern int           isaddindex(int, struct keydesc *);
+extern int           isaudit(int, {char} *, int);
+extern int           isbegin(void);
+extern int           isbuild({char} *, int, struct keydesc *, int);
+extern int           iscleanup(void);
+extern int           isclose(int);
+extern int           iscluster(int, struct keydesc *);
+extern int           iscommit(void);
+extern int           isdelcurr(int);
+extern int           isdelete(int, {char} *);
+extern int           isdelindex(int, struct keydesc *);
+extern int           isdelrec(int, {lngsz});
+extern int           iserase({char} *);
+extern int           isflush(int);
+extern int           islock(int);
+extern int           islogclose(void);
+extern int           islogopen({char} *);
+extern int           isopen({char} *, int);
+extern int           isread(int, {char} *, int);
+extern int           isrecover(void);
+extern int           isrelease(int);
+extern int           isrename({char} *, {char} *);
+extern int           isrewcurr(int, {char} *);
+extern int           isrewrec(int, {lngsz}, {char} *);
+extern int           isrewrite(int, {char} *);
+extern int           isrollback(void);
+extern int           issetunique(int, {lngsz});
+extern int           isstart(int, struct keydesc *, int, {char} *, int);
+extern int           isuniqueid(int, {lngsz} *);
+extern int           isunlock(int);
+extern int           iswrcurr(int, {char} *);
+extern int           iswrite(int, {char} *);
+'''
+
 class CFFI_Builder(Builder):
   'Class providing the shared methods for the CFFI builders'
   decimal_h_code = None
   isam_h_code = None
   max_key_parts = 8
+  cdef_char = 'char'       # Character type used by the variant
+  decimal_long = None      # Long type used by decimal.h if not lngsz
   backend = 'cffi'
 
   def __init__(self, workdir, srcdir, instdir, bits, lngsz=None):
-    import cffi
     Builder.__init__(self, workdir, srcdir, instdir, bits, lngsz)
-    self._ffi = cffi.FFI()
+    # Format the definitions once for this variant
+    fields = dict(lngsz=self.lngsz, char=self.cdef_char, max_key_parts=self.max_key_parts,
+                  declong=self.decimal_long or self.lngsz)
+    self._cdefs = [code.format(**fields) for code in (self.decimal_h_code, self.isam_h_code) if code]
+    self._sigfile = os.path.join(self._workdir_str, f'{self._modname}.sig.json')
+    self._source = None
 
   def prepare(self):
     libdir = self._srcdir / self._libdir
@@ -154,15 +466,83 @@ class CFFI_Builder(Builder):
     incldir = libdir / 'include'
     if not incldir.exists():
       incldir = libdir
-    self.source_on_change(incldir, self._hdrs)
+    self.source_on_change(incldir, self._hdrs, link=True)
     self.source_on_change(libdir, self._libs)
 
+  @property
+  def _modname(self):
+    'Name of the CFFI extension module being built'
+    return f'_{self.variant}_cffi'
+
+  # Additional options used when compiling and linking the extension modules
+  extra_compile_args = ['-O2', '-fno-plt']
+  extra_link_args = ['-Wl,-O1']
+
+  def set_source(self, source, **kwds):
+    'Record the C source of the extension module, it is only passed to CFFI if a build is needed'
+    kwds.setdefault('extra_compile_args', self.extra_compile_args)
+    kwds.setdefault('extra_link_args', self.extra_link_args)
+    self._source = (self._modname, source, kwds)
+
+  def _signature(self, *code):
+    'Return the signature of CODE and everything else the compiled extension module depends upon'
+    import cffi
+    hsh = _new_hash()
+    for part in [*code, repr(self._source), cffi.__version__, sys.version]:
+      hsh.update(part if isinstance(part, bytes) else part.encode())
+    for hdr in self._hdrs:
+      hsh.update(self._hashes.digest(self._workdir / hdr))
+    return hsh.hexdigest()
+
+  def define_source(self):
+    'Set the C source of the extension module using set_source()'
+    raise NotImplementedError
+
+  def _previous(self):
+    'Return the signature of the module definitions and the details saved by the previous build'
+    if self._source is None:
+      self.define_source()
+    sig = self._signature(*self._cdefs)
+    try:
+      with open(self._sigfile) as fd:
+        prev = json.load(fd)
+    except (OSError, ValueError):
+      prev = {}
+    return sig, prev
+
+  def needs_compile(self):
+    'Return whether the extension module has to be built again'
+    sig, prev = self._previous()
+    return prev.get('sig') != sig or not os.path.exists(prev.get('so', ''))
+
   def compile(self):
-    if self.decimal_h_code:
-      self._ffi.cdef(self.decimal_h_code.format(self=self))
-    if self.isam_h_code:
-      self._ffi.cdef(self.isam_h_code.format(self=self))
-    self._mod_so = pathlib.Path(self._ffi.compile(tmpdir=self._workdir))
+    cdefs = self._cdefs
+
+    # Reuse the extension module from a previous build if nothing has changed
+    sig, prev = self._previous()
+    if prev.get('sig') == sig and os.path.exists(prev.get('so', '')):
+      self._mod_so = pathlib.Path(prev['so'])
+      return
+
+    # Creating the FFI loads the C parser so it is only done when building
+    import cffi
+    self._ffi = cffi.FFI()
+    modname, source, kwds = self._source
+    self._ffi.set_source(modname, source, **kwds)
+    for code in cdefs:
+      self._ffi.cdef(code)
+
+    # Only invoke the compiler if the generated C source has changed
+    cfile = self._workdir / f'{self._modname}.c'
+    self._ffi.emit_c_code(str(cfile))
+    csig = self._signature(_hash_file(cfile))
+    if prev.get('csig') == csig and os.path.exists(prev.get('so', '')):
+      self._mod_so = pathlib.Path(prev['so'])
+    else:
+      with _ccache_env(self._workdir_str):
+        self._mod_so = pathlib.Path(self._ffi.compile(tmpdir=self._workdir_str))
+    with open(self._sigfile, 'w') as fd:
+      json.dump({'sig': sig, 'csig': csig, 'so': str(self._mod_so)}, fd)
 
 class _Library:
   'Class providing a means to handle library names according to use'
@@ -190,7 +570,7 @@ class IFISAM_Mixin:
     incldir = libdir / 'include'
     if not incldir.exists():
       incldir = libdir
-    self.source_on_change(incldir, self._hdrs)
+    self.source_on_change(incldir, self._hdrs, link=True)
     self.source_on_change(libdir, self._libs)
 
   def install(self, addmissing=True):
@@ -212,53 +592,16 @@ class CTYPES_IFISAM_Builder(CTYPES_Builder, IFISAM_Mixin):
 class CFFI_IFISAM_Builder(CFFI_Builder, IFISAM_Mixin):
   'Class encapsulating the information to compile the IFISAM CFFI module'
   # Define items found in decimal.h
-  decimal_h_code = '''
-struct decimal;
-extern int   decadd(struct decimal *, struct decimal *, struct decimal *);
-extern int   decsub(struct decimal *, struct decimal *, struct decimal *);
-extern int   decmul(struct decimal *, struct decimal *, struct decimal *);
-extern int   decdiv(struct decimal *, struct decimal *, struct decimal *);
-extern int   deccmp(struct decimal *, struct decimal *);
-extern void  deccopy(struct decimal *, struct decimal *);
-extern int   deccvasc(char *, int, struct decimal *);
-extern int   deccvdbl(double, struct decimal *);
-extern int   deccvint(int, struct decimal *);
-extern int   deccvlong({self.lngsz}, struct decimal *);
-extern char *dececvt(struct decimal *, int, int *, int *);
-extern char *decfcvt(struct decimal *, int, int *, int *);
+  decimal_h_code = _decimal_cdef + '''
 extern void  decround(struct decimal *, int);
-extern int   dectoasc(struct decimal *, char *, int, int);
-extern int   dectodbl(struct decimal *, double *);
-extern int   dectoint(struct decimal *, int *);
-extern int   dectolong(struct decimal *, {self.lngsz} *);
 extern void  dectrunc(struct decimal *, int);
-extern int   deccvflt(double, struct decimal *);
-extern int   dectoflt(struct decimal *, float *);
 '''
 
   # Define items found in isam.h
-  isam_h_code = '''
-struct keypart {{
-    short kp_start;
-    short kp_leng;
-    short kp_type;
-}};
-struct keydesc {{
-    short          k_flags;
-    short          k_nparts;
-    struct keypart k_part[{self.max_key_parts}];
-    short          k_len;
-    ...;
-}};
-struct dictinfo {{
-    short        di_nkeys;
-    short        di_recsize;
-    short        di_idxsize;
-    {self.lngsz} di_nrecords;
-}};
+  isam_h_code = _isam_struct_cdef + '''
 extern int           iserrno;
 extern int           iserrio;
-extern {self.lngsz}  isrecnum;
+extern {lngsz}  isrecnum;
 extern int           isreclen;
 extern char         *isversnumber;
 extern char         *iscopyright;
@@ -266,61 +609,27 @@ extern char         *isserial;
 extern int           issingleuser;
 extern int           is_nerr;
 extern char         *is_errlist[];
-extern int           isaddindex(int, struct keydesc *);
-extern int           isaudit(int, char *, int);
-extern int           isbegin(void);
-extern int           isbuild(char *, int, struct keydesc *, int);
-extern int           iscleanup(void);
-extern int           isclose(int);
-extern int           iscluster(int, struct keydesc *);
-extern int           iscommit(void);
-extern int           isdelcurr(int);
-extern int           isdelete(int, char *);
-extern int           isdelindex(int, struct keydesc *);
-extern int           isdelrec(int, {self.lngsz});
 extern int           isdictinfo(int, struct dictinfo *);
-extern int           iserase(char *);
-extern int           isflush(int);
 extern int           isindexinfo(int, void *, int);
 extern int           iskeyinfo(int, struct keydesc *, int);
 extern void          islangchk(void);
 extern char         *islanginfo(char *);
-extern int           islock(int);
-extern int           islogclose(void);
-extern int           islogopen(char *);
 extern int           isnlsversion(char *);
 extern int           isglsversion(char *);
 extern void          isnolangchk(void);
-extern int           isopen(char *, int);
-extern int           isread(int, char *, int);
-extern int           isrecover(void);
-extern int           isrelease(int);
-extern int           isrename(char *, char *);
-extern int           isrewcurr(int, char *);
-extern int           isrewrec(int, {self.lngsz}, char *);
-extern int           isrewrite(int, char *);
-extern int           isrollback(void);
-extern int           issetunique(int, {self.lngsz});
-extern int           isstart(int, struct keydesc *, int, char *, int);
-extern int           isuniqueid(int, {self.lngsz} *);
-extern int           isunlock(int);
-extern int           iswrcurr(int, char *);
-extern int           iswrite(int, char *);
-'''
+''' + _isam_func_cdef
   def __init__(self, workdir, srcdir, instdir, bits=64):
     CFFI_Builder.__init__(self, workdir, srcdir, instdir, bits, 'int32_t')
     IFISAM_Mixin.__init__(self, bits)
 
-  def compile(self):
-    self._ffi.set_source(
-      f'_{self.variant}_cffi',
+  def define_source(self):
+    self.set_source(
       '#include <stdint.h>\n#include "isam.h"',
       library_dirs=[str(self._workdir)],
       runtime_library_dirs=['$ORIGIN/../lib'],
       libraries=['ifisam', 'ifisamx'],
       include_dirs=[self._workdir],
     )
-    super().compile()
 
 class VBISAM_Mixin:
   _vbisam_so = _Library('vbisam')
@@ -342,107 +651,37 @@ class CTYPES_VBISAM_Builder(CTYPES_Builder, VBISAM_Mixin):
 
 class CFFI_VBISAM_Builder(CFFI_Builder, VBISAM_Mixin):
   'Class encapsulating the information to compile the VBISAM CFFI module'
-  # Define items found in vbdecimal.h
-  decimal_h_code = '''
-struct decimal;
-extern int          decadd(struct decimal *, struct decimal *, struct decimal *);
-extern int          decsub(struct decimal *, struct decimal *, struct decimal *);
-extern int          decmul(struct decimal *, struct decimal *, struct decimal *);
-extern int          decdiv(struct decimal *, struct decimal *, struct decimal *);
-extern int          deccmp(struct decimal *, struct decimal *);
-extern void         deccopy(struct decimal *, struct decimal *);
-extern int          deccvasc(signed char *, int, struct decimal *);
-extern int          deccvdbl(double, struct decimal *);
-extern int          deccvint(int, struct decimal *);
-extern int          deccvlong(long, struct decimal *);
-extern signed char *dececvt(struct decimal *, int, int *, int *);
-extern signed char *decfcvt(struct decimal *, int, int *, int *);
-/*extern void         decround(struct decimal *, int);  -- Not implemented */
-extern int          dectoasc(struct decimal *, signed char *, int, int);
-extern int          dectodbl(struct decimal *, double *);
-extern int          dectoint(struct decimal *, int *);
-extern int          dectolong(struct decimal *, long *);
-/*extern void         dectrunc(struct decimal *, int);  -- Not implemented */
-extern int          deccvflt(double, struct decimal *);
-extern int          dectoflt(struct decimal *, float *);
-'''
+  cdef_char = 'signed char'
+  decimal_long = 'long'
+
+  # Define items found in vbdecimal.h (decround and dectrunc are not implemented)
+  decimal_h_code = _decimal_cdef
 
   # Define items found in vbisam.h
-  isam_h_code = '''
-struct keypart {{
-    short kp_start;
-    short kp_leng;
-    short kp_type;
-}};
-struct keydesc {{
-    short          k_flags;
-    short          k_nparts;
-    struct keypart k_part[{self.max_key_parts}];
-    short          k_len;
-    ...;
-}};
-struct dictinfo {{
-    short        di_nkeys;
-    short        di_recsize;
-    short        di_idxsize;
-    {self.lngsz} di_nrecords;
-}};
+  isam_h_code = _isam_struct_cdef + '''
 extern void         *vb_get_rtd(void);     /* Used to initialise library correctly */
 extern int           is_nerr(void);
 extern int           iserrno(void);
 extern int           iserrio(void);
-extern {self.lngsz}  isrecnum(void);
-extern int           set_isrecnum({self.lngsz};
+extern {lngsz}  isrecnum(void);
+extern int           set_isrecnum({lngsz});
 extern int           isreclen(void);
 extern int           set_isreclen(int);
 extern const char   *is_strerror(int);
-extern int           isaddindex(int, struct keydesc *);
-extern int           isaudit(int, signed char *, int);
-extern int           isbegin(void);
-extern int           isbuild(signed char *, int, struct keydesc *, int);
-extern int           iscleanup(void);
-extern int           isclose(int);
-extern int           iscluster(int, struct keydesc *);
-extern int           iscommit(void);
-extern int           isdelcurr(int);
-extern int           isdelete(int, signed char *);
-extern int           isdelindex(int, struct keydesc *);
-extern int           isdelrec(int, {self.lngsz});
 extern int           isdictinfo(int, struct dictinfo *);
-extern int           iserase(signed char *);
-extern int           isflush(int);
 extern int           isindexinfo(int, void *, int);
 extern int           iskeyinfo(int, struct keydesc *, int);
 /*extern void          islangchk(void);   -- Not implemented */
 /*extern char         *islanginfo(char *);   -- Not implemented */
-extern int           islock(int);
-extern int           islogclose(void);
-extern int           islogopen(signed char *);
 /*extern int           isnlsversion(char *);   -- Not implemented */
 /*extern int           isglsversion(char *);   -- Not implemented */
 /*extern void          isnolangchk(void);   -- Not implemented */
-extern int           isopen(signed char *, int);
-extern int           isread(int, signed char *, int);
-extern int           isrecover(void);
-extern int           isrelease(int);
-extern int           isrename(signed char *, signed char *);
-extern int           isrewcurr(int, signed char *);
-extern int           isrewrec(int, {self.lngsz}, signed char *);
-extern int           isrewrite(int, signed char *);
-extern int           isrollback(void);
-extern int           issetunique(int, {self.lngsz});
-extern int           isstart(int, struct keydesc *, int, signed char *, int);
-extern int           isuniqueid(int, {self.lngsz} *);
-extern int           isunlock(int);
-extern int           iswrcurr(int, signed char *);
-extern int           iswrite(int, signed char *);
-'''
+''' + _isam_func_cdef
   def __init__(self, workdir, srcdir, instdir, bits=64):
     CFFI_Builder.__init__(self, workdir, srcdir, instdir, bits, 'long long int')
 
-  def compile(self):
-    self._ffi.set_source(
-      f'_{self.variant}_cffi',
+  def define_source(self):
+    self.set_source(
       '#include <stdint.h>\n#include "vbisam.h"',
       library_dirs=[str(self._workdir)],
       libraries=['vbisam'],
@@ -450,7 +689,6 @@ extern int           iswrite(int, signed char *);
       include_dirs=[self._workdir],
       define_macros=[('NEED_IFISAM_COMPAT', '1'), ('NEED_ROW_COUNT', 1)],
     )
-    super().compile()
 
 class DISAM_Mixin:
   _disam_so = _Library('disam72')
@@ -469,25 +707,7 @@ class CFFI_DISAM_Builder(CFFI_Builder, DISAM_Mixin):
   max_key_parts = 20
 
   # Define items found in disam.h
-  isam_h_code = '''
-struct keypart {{
-    short kp_start;
-    short kp_leng;
-    short kp_type;
-}};
-struct keydesc {{
-    short          k_flags;
-    short          k_nparts;
-    struct keypart k_part[{self.max_key_parts}];
-    short          k_len;
-    ...;
-}};
-struct dictinfo {{
-    short        di_nkeys;
-    short        di_recsize;
-    short        di_idxsize;
-    {self.lngsz} di_nrecords;
-}};
+  isam_h_code = _isam_struct_cdef + '''
 extern int           iserrno;
 extern int           iserrio;
 extern long int      isrecnum;
@@ -498,59 +718,25 @@ extern char         *iscopyright;
 /* extern int           issingleuser;  -- Not Implemented */
 extern int           is_nerr;
 extern char         *is_errlist[];
-extern int           isaddindex(int, struct keydesc *);
-extern int           isaudit(int, char *, int);
-extern int           isbegin(void);
-extern int           isbuild(char *, int, struct keydesc *, int);
-extern int           iscleanup(void);
-extern int           isclose(int);
-extern int           iscluster(int, struct keydesc *);
-extern int           iscommit(void);
-extern int           isdelcurr(int);
-extern int           isdelete(int, char *);
-extern int           isdelindex(int, struct keydesc *);
-extern int           isdelrec(int, {self.lngsz});
-extern int           iserase(char *);
-extern int           isflush(int);
 extern int           isindexinfo(int, struct keydesc *, int);
 extern int           isisaminfo(int, struct dictinfo *);
 /* extern void          islangchk(void);  -- Not Implemented */
 /* extern char         *islanginfo(char *); -- Not Implemented */
-extern int           islock(int);
-extern int           islogclose(void);
-extern int           islogopen(char *);
 /* extern int           isnlsversion(char *); -- Not Implemented */
 /* extern int           isglsversion(char *); -- Not Implemented */
 /* extern void          isnolangchk(void);  -- Not Implemented */
-extern int           isopen(char *, int);
-extern int           isread(int, char *, int);
-extern int           isrecover(void);
-extern int           isrelease(int);
-extern int           isrename(char *, char *);
-extern int           isrewcurr(int, char *);
-extern int           isrewrec(int, {self.lngsz}, char *);
-extern int           isrewrite(int, char *);
-extern int           isrollback(void);
-extern int           issetunique(int, {self.lngsz});
-extern int           isstart(int, struct keydesc *, int, char *, int);
-extern int           isuniqueid(int, {self.lngsz} *);
-extern int           isunlock(int);
-extern int           iswrcurr(int, char *);
-extern int           iswrite(int, char *);
-'''
+''' + _isam_func_cdef
   def __init__(self, workdir, srcdir, instdir, bits=64):
     super().__init__(workdir, srcdir, instdir, 'uint32_t', bits)
 
-  def compile(self):
-    self._ffi.set_source(
-      f'_{self.variant}_cffi',
+  def define_source(self):
+    self.set_source(
       '#include <stdint.h>\n#include "disam.h"',
       library_dirs=[str(self._workdir)],
       runtime_library_dirs=['$ORIGIN/../lib'],
       libraries=['disam72'],
       include_dirs=[self._workdir],
     )
-    super().compile()
 
 class ModuleGenerator:
   'Class encapsulating the module generation logic'
@@ -601,6 +787,44 @@ if __name__ == '__main2__':
   mods.compile()
   mods.install()
 
+def _warm_cffi():
+  '''Import CFFI and build its C parser by parsing a trivial declaration, CFFI keeps
+     the parser for the process so forked builders do not each pay for it.'''
+  import cffi
+  cffi.FFI().cdef('int _pyisam_warmup;')
+
+def _builder(klass, args):
+  'Return the builder for KLASS using its own working directory'
+  workdir = WORKDIR / klass.backend / klass.variant
+  workdir.mkdir(parents=True, exist_ok=True)
+  return klass(workdir, SOURCEDIR, INSTDIR, *args)
+
+def _prepare(klass, args):
+  '''Prepare the working directory for a single module, this is run in a separate
+     process for each of the modules and returns whether it has to be compiled.'''
+  bldmod = _builder(klass, args)
+  bldmod.prepare()
+  stale = bldmod.needs_compile()
+  bldmod._hashes.save()
+  return stale
+
+def _build(klass, args, prepare=True):
+  '''Perform the build steps for a single module, this is run in a separate
+     process for each of the modules being built and returns the module built.'''
+  bldmod = _builder(klass, args)
+  if prepare:
+    bldmod.prepare()
+  bldmod.compile()
+  bldmod._hashes.save()   # Exit handlers are not run in the worker processes
+  return bldmod._mod_so
+
+def _install(klass, args, mod_so):
+  '''Install a module built by _build, this is run in the main process for one
+     module at a time as the backends of a variant install the same libraries.'''
+  bldmod = _builder(klass, args)
+  bldmod._mod_so = mod_so
+  bldmod.install()
+
 if __name__ == '__main__':
   bld_cffi = True      # Enable building of CFFI modules
   bld_ctypes = False    # Enable building of CTYPES modules
@@ -609,35 +833,52 @@ if __name__ == '__main__':
   bld_disam = False    # Enable building of DISAM variant
   do_install = False    # Enable installation of libraries
 
-  # Store the backend/variants actually created to process later
+  # Store the builder class and extra arguments for the backend/variants to create
   all_modules = []
   if bld_cffi:
     # Prepare for building the CFFI modules
     if bld_ifisam:
-      all_modules.append(CFFI_IFISAM_Builder(WORKDIR, SOURCEDIR, INSTDIR))
+      all_modules.append((CFFI_IFISAM_Builder,))
     if bld_vbisam:
-      all_modules.append(CFFI_VBISAM_Builder(WORKDIR, SOURCEDIR, INSTDIR, 'mbuild'))
+      all_modules.append((CFFI_VBISAM_Builder, 'mbuild'))
     if bld_disam:
-      all_modules.append(CFFI_DISAM_Builder(WORKDIR, SOURCEDIR, INSTDIR))
+      all_modules.append((CFFI_DISAM_Builder,))
 
   if bld_ctypes:
     # Prepare for building the CTYPES modules
     if bld_ifisam:
-      all_modules.append(CTYPES_IFISAM_Builder(WORKDIR, SOURCEDIR, INSTDIR))
+      all_modules.append((CTYPES_IFISAM_Builder,))
     if bld_vbisam:
-      all_modules.append(CTYPES_VBISAM_Builder(WORKDIR, SOURCEDIR, INSTDIR, 'mbuild'))
+      all_modules.append((CTYPES_VBISAM_Builder, 'mbuild'))
     if bld_disam:
-      all_modules.append(CTYPES_DISAM_Builder(WORKDIR, SOURCEDIR, INSTDIR))
+      all_modules.append((CTYPES_DISAM_Builder,))
 
-  # If we are processing anything create the working directory
+  # The modules are independent of each other so build them in parallel,
+  # the result of each is retrieved to raise any exception that occurred
   if all_modules:
-    WORKDIR.mkdir(exist_ok=True)
-
-    # Process the list of modules to bring all necessary files into place first
-    for bldmod in all_modules:
-      bldmod.prepare()
-    for bldmod in all_modules:
-      bldmod.compile()
+    # When the workers are forked and several CFFI modules are enabled, prepare them
+    # first and only warm up the CFFI parser, to be inherited by the workers, if more
+    # than one of them has to be compiled
+    import multiprocessing
+    prepared = sum(klass.backend == 'cffi' for klass, *args in all_modules) > 1 and \
+             multiprocessing.get_start_method() == 'fork'
+    if prepared:
+      with concurrent.futures.ProcessPoolExecutor() as executor:
+        stale = list(executor.map(_prepare, *zip(*[(klass, args) for klass, *args in all_modules])))
+      if sum(klass.backend == 'cffi' and needed
+             for (klass, *args), needed in zip(all_modules, stale)) > 1:
+        _warm_cffi()
+    built = []
+    with concurrent.futures.ProcessPoolExecutor() as executor:
+      pending = {executor.submit(_build, klass, args, not prepared): (klass, args)
+                 for klass, *args in all_modules}
+      for future in concurrent.futures.as_completed(pending):
+        klass, args = pending[future]
+        built.append((klass, args, future.result()))
+        print('Built:', f'{klass.backend}.{klass.variant}')
+
+    # Install the modules one at a time once all of them have been built
     if do_install:
-      for bldmod in all_modules:
-        bldmod.install()
+      for klass, args, mod_so in built:
+        _install(klass, args, mod_so)
+        print('Installed:', f'{klass.backend}.{klass.variant}')